@@ -1,37 +1,33 @@
+import argparse
+import contextlib
+import os
 import random
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Final
 
 
-class Point:
+Point = tuple[int, int]  # точка на доске: (номер строки, номер столбца), считая с 0
 
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Point):
-            return False
-        return self.x == other.x and self.y == other.y
-
-    def __repr__(self) -> str:
-       return f"({self.x}, {self.y})"
+# Шаг (dx, dy) вдоль корабля для каждого направления: 0 - горизонтальное, 1 - вертикальное
+_DIR_DELTAS: Final = ((0, 1), (1, 0))
 
 
 class Ship:
+    __slots__ = ("bow", "length", "direction", "lives", "points")
+
     def __init__(self, bow: Point, length: int, direction: int):
         self.bow = bow  # начальная точка (нос корабля)
         self.length = length  # длина корабля в клетках
         self.direction = direction  # направление (0 - горизонтальное, 1 - вертикальное)
         self.lives = length  # количество жизней корабля (равно его длине)
 
-    @property
-    def points(self) -> list[Point]:
-        ship_points = []
-        for i in range(self.length):
-            # Вычисляем координаты каждой точки корабля в зависимости от направления
-            cur_x = self.bow.x + i * (self.direction == 1)
-            cur_y = self.bow.y + i * (self.direction == 0)
-            ship_points.append(Point(cur_x, cur_y))
-        return ship_points
+        # Точки корабля вычисляются один раз: корабль не двигается
+        bx, by = bow
+        dx, dy = _DIR_DELTAS[direction]
+        self.points = [(bx + i * dx, by + i * dy) for i in range(length)]
 
     def hit(self, shot: Point) -> bool:
         return shot in self.points
@@ -55,91 +51,195 @@ class BoardWrongShipException(BoardException):
     pass
 
 
+# Клетки поля хранятся байтами: "O" - пусто, "#" - корабль, "X" - попадание, "T" - промах, "." - контур
+SHIP: Final = ord("#")
+HIT: Final = ord("X")
+MISS: Final = ord("T")
+CONTOUR: Final = ord(".")
+
+_HIDE_SHIPS: Final = bytes.maketrans(b"#", b"O")  # на скрытой доске корабли выглядят как пустые клетки
+
+# Смещения к восьми соседним клеткам
+_NEAR: Final = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1)
+)
+
+
+@lru_cache(maxsize=None)
+def _neighbor_masks(size: int) -> list[int]:
+    # Для каждой клетки - маска квадрата 3x3 вокруг нее (вместе с самой клеткой), обрезанная краями доски
+    res = []
+    for x in range(size):
+        for y in range(size):
+            near = 1 << (x * size + y)
+            for dx, dy in _NEAR:
+                cx, cy = x + dx, y + dy
+                if 0 <= cx < size and 0 <= cy < size:
+                    near |= 1 << (cx * size + cy)
+            res.append(near)
+    return res
+
+
+@lru_cache(maxsize=None)
+def _placements(size: int, length: int) -> list[tuple[int, int, Point, int]]:
+    # Все позиции корабля на доске: (маска клеток, маска клеток с контуром, нос, направление)
+    near = _neighbor_masks(size)
+    res = []
+    for d in (0, 1) if length > 1 else (0,):
+        for x in range(size):
+            for y in range(size):
+                ship = Ship((x, y), length, d)
+                if any(not (0 <= px < size and 0 <= py < size) for px, py in ship.points):
+                    continue
+                ship_mask = zone = 0
+                for px, py in ship.points:
+                    ship_mask |= 1 << (px * size + py)
+                    zone |= near[px * size + py]
+                res.append((ship_mask, zone, (x, y), d))
+    return res
+
+
+def _generate_board(size: int, lens: list[int], rng: random.Random) -> list[tuple[Point, int, int]] | None:
+    # Расстановка кораблей целиком на битовых масках, без объектов Board
+    busy = 0
+    res = []
+    for l in lens:
+        candidates = [p for p in _placements(size, l) if not p[0] & busy]
+        if not candidates:
+            return None  # для очередного корабля не осталось места
+        _, zone, bow, d = rng.choice(candidates)
+        busy |= zone
+        res.append((bow, l, d))
+    return res
+
+
+def flush(log: list[str]) -> None:
+    # Выводим накопленные сообщения одной записью в stdout
+    sys.stdout.write("".join(log))
+    log.clear()
+
+
 class Board:
-    def __init__(self, size: int = 6, hidden: bool = False):
+    HEADER: Final = "  | 1 | 2 | 3 | 4 | 5 | 6 |"
+
+    def __init__(self, size: int = 6, hidden: bool = False, log: list[str] | None = None):
         self.size = size  # размер доски
-        self.field = [["O"] * size for _ in range(size)]  # двумерный массив для хранения состояния поля
-        self.busy = []  # список занятых точек
-        self.ships = []  # список кораблей на доске
-        self.shots = []  # список точек, куда уже стреляли
+        self.field = bytearray(b"O" * (size * size))  # состояние поля построчно, клетка (x, y) - байт x * size + y
+        # Множества клеток хранятся битовыми масками: клетке (x, y) соответствует бит x * size + y
+        self.busy_mask = 0  # занятые клетки
+        self._live_ships = 0  # количество еще не потопленных кораблей
+        self._near = _neighbor_masks(size)  # маски соседей для каждой клетки
+        self.ships: list[Ship] = []  # список кораблей на доске
+        self._cell_to_ship: dict[Point, Ship] = {}  # какой корабль стоит в клетке
+        self.shots_mask = 0  # клетки, куда уже стреляли
         self.hidden = hidden  # скрыты ли корабли (используется для доски компьютера)
+        self._cached_str: dict[bool, str] = {}  # отрисованная доска для каждого значения hidden
+        self.log = [] if log is None else log  # буфер сообщений для вывода
+
+    def bit(self, p: Point) -> int:
+        return 1 << (p[0] * self.size + p[1])
+
+    def mask(self, points: list[Point]) -> int:
+        res = 0
+        for p in points:
+            res |= self.bit(p)
+        return res
+
+    def ship_at(self, p: Point) -> Ship | None:
+        return self._cell_to_ship.get(p)
+
+    def fits(self, ship: Ship) -> bool:
+        if any(self.out(p) for p in ship.points):
+            return False
+        return not self.mask(ship.points) & self.busy_mask
 
     def add_ship(self, ship: Ship) -> None:
+        if not self.fits(ship):
+            raise BoardWrongShipException()
         for p in ship.points:
-            if self.out(p) or p in self.busy:
-                raise BoardWrongShipException()
-        for p in ship.points:
-            self.field[p.x][p.y] = "■"
-            self.busy.append(p)
+            self.field[p[0] * self.size + p[1]] = SHIP
+            self._cell_to_ship[p] = ship
+        self.busy_mask |= self.mask(ship.points)
+        self._cached_str.clear()
 
         self.ships.append(ship)
+        self._live_ships += 1
         self.contour(ship)
 
     def contour(self, ship: Ship, verb: bool = False) -> None:
-        near = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1), (0, 0), (0, 1),
-            (1, -1), (1, 0), (1, 1)
-        ]
-        for p in ship.points:
-            for dx, dy in near:
-                cur = Point(p.x + dx, p.y + dy)
-                if not self.out(cur) and cur not in self.busy:
-                    if verb:
-                        self.field[cur.x][cur.y] = "."
-                    self.busy.append(cur)
+        zone = 0
+        for x, y in ship.points:
+            zone |= self._near[x * self.size + y]
+        if verb:
+            # Отмечаем на поле только новые клетки контура; клетки корабля уже лежат в busy_mask
+            new = zone & ~self.busy_mask
+            while new:
+                low = new & -new
+                self.field[low.bit_length() - 1] = CONTOUR
+                new ^= low
+            self._cached_str.clear()
+        self.busy_mask |= zone
 
     def out(self, p: Point) -> bool:
-        return not (0 <= p.x < self.size and 0 <= p.y < self.size)
+        return not (0 <= p[0] < self.size and 0 <= p[1] < self.size)
 
     def shot(self, p: Point) -> bool:
         if self.out(p):
             raise BoardOutException()
 
-        if p in self.shots:
+        bit = self.bit(p)
+        if self.shots_mask & bit:
             raise BoardUsedException()
 
-        self.shots.append(p)
-
-        for ship in self.ships:
-            if ship.hit(p):
-                ship.lives -= 1
-                self.field[p.x][p.y] = "X"  # помечаем попадание
-                if ship.lives == 0:
-                    self.contour(ship, verb=True)  # обводим контур вокруг уничтоженного корабля
-                    print("Корабль уничтожен!")
-                else:
-                    print("Корабль ранен!")
-                return True
-
-        self.field[p.x][p.y] = "T"  # помечаем промах
-        print("Мимо!")
+        self.shots_mask |= bit
+        self._cached_str.clear()
+
+        ship = self.ship_at(p)
+        if ship is not None:
+            ship.lives -= 1
+            self.busy_mask |= bit  # подбитая клетка не попадет в контур
+            self.field[p[0] * self.size + p[1]] = HIT  # помечаем попадание
+            if ship.lives == 0:
+                self._live_ships -= 1
+                self.contour(ship, verb=True)  # обводим контур вокруг уничтоженного корабля
+                self.log.append("Корабль уничтожен!\n")
+            else:
+                self.log.append("Корабль ранен!\n")
+            return True
+
+        self.field[p[0] * self.size + p[1]] = MISS  # помечаем промах
+        self.log.append("Мимо!\n")
         return False
 
     def begin(self) -> None:
-        self.busy = []
+        self.busy_mask = 0
 
     def __str__(self) -> str:
-        res = ""
-        res += "  | 1 | 2 | 3 | 4 | 5 | 6 |"
-        for i, row in enumerate(self.field):
-            res += f"\n{i + 1} | "
-            for j in row:
-                # Скрываем корабли на доске компьютера
-                if self.hidden and j == "■":
-                    res += "O | "
-                else:
-                    res += f"{j} | "
+        cached = self._cached_str.get(self.hidden)
+        if cached is not None:
+            return cached
+
+        # Скрываем корабли на доске компьютера
+        field = self.field.translate(_HIDE_SHIPS) if self.hidden else self.field
+        cells = field.decode().replace("#", "■")
+        rows = [self.HEADER]
+        for i in range(self.size):
+            rows.append("%d | %s | " % (i + 1, " | ".join(cells[i * self.size:(i + 1) * self.size])))
+        res = "\n".join(rows)
+        self._cached_str[self.hidden] = res
         return res
 
     def defeat(self) -> bool:
-        return all(ship.lives == 0 for ship in self.ships)
+        return self._live_ships == 0
 
 
 class Player:
-    def __init__(self, board: Board, enemy: Board):
+    def __init__(self, board: Board, enemy: Board, log: list[str]):
         self.board = board
         self.enemy = enemy
+        self.log = log  # буфер сообщений для вывода
 
     def ask(self) -> Point:
         raise NotImplementedError()
@@ -151,63 +251,111 @@ class Player:
                 repeat = self.enemy.shot(target)  # выстрел по доске противника
                 return repeat  # возвращаем True, если выстрел попал, иначе False
             except BoardException as e:
-                print(e)  # выводим сообщение об ошибке и повторяем попытку
+                self.log.append(f"{e}\n")  # выводим сообщение об ошибке и повторяем попытку
 
 
 class AI(Player):
-    def ask(self) -> Point:
-        while True:
-            p = Point(random.randint(0, 5), random.randint(0, 5))
-            if p not in self.enemy.shots:  # проверяем, что в эту точку еще не стреляли
-                print(f"Ход компьютера: {p.x + 1} {p.y + 1}")
+    def __init__(self, board: Board, enemy: Board, log: list[str], rng: random.Random, name: str = "компьютера"):
+        super().__init__(board, enemy, log)
+        self.name = name  # чей ход выводится в сообщениях
+        # Клетки доски противника, по которым еще не стреляли, в случайном порядке
+        self._remaining = [(x, y) for x in range(enemy.size) for y in range(enemy.size)]
+        rng.shuffle(self._remaining)
+        self._targets: deque[Point] = deque()  # клетки рядом с подбитым кораблем, которые стоит проверить
+        self._last_hits: list[Point] = []  # попадания по текущему недобитому кораблю
+        self._last: Point = (0, 0)  # клетка последнего выстрела
+
+    def _fresh(self, p: Point) -> bool:
+        # В клетку еще не стреляли, и она не лежит в контуре потопленного корабля
+        idx = p[0] * self.enemy.size + p[1]
+        return not self.enemy.shots_mask >> idx & 1 and self.enemy.field[idx] != CONTOUR
+
+    def _hunt(self) -> Point:
+        # Корабль длины n обязательно займет клетку с (x + y) % n == 0, поэтому ищем только среди них
+        parity = min(ship.length for ship in self.enemy.ships)
+        remaining = self._remaining
+        for i in reversed(range(len(remaining))):
+            p = remaining[i]
+            if not self._fresh(p):
+                del remaining[i]
+            elif (p[0] + p[1]) % parity == 0:
+                del remaining[i]
                 return p
+        return remaining.pop()  # подходящих по четности клеток нет, а отработанные уже удалены
+
+    def ask(self) -> Point:
+        while self._targets:
+            p = self._targets.popleft()
+            if self._fresh(p):
+                break
+        else:
+            p = self._hunt()
+        self.log.append(f"Ход {self.name}: {p[0] + 1} {p[1] + 1}\n")
+        self._last = p
+        return p
+
+    def move(self) -> bool:
+        repeat = super().move()
+        if repeat:
+            p = self._last
+            ship = self.enemy.ship_at(p)
+            assert ship is not None  # выстрел был удачным, значит в клетке есть корабль
+            if ship.lives == 0:
+                # Корабль потоплен - возвращаемся к поиску
+                self._targets.clear()
+                self._last_hits.clear()
+            else:
+                self._last_hits.append(p)
+                x, y = p
+                near = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
+                if len(self._last_hits) >= 2:
+                    # Направление корабля известно - добиваем только вдоль него
+                    axis = 0 if self._last_hits[0][0] == x else 1
+                    self._targets = deque(t for t in self._targets if t[axis] == p[axis])
+                    near = [t for t in near if t[axis] == p[axis]]
+                self._targets.extend(t for t in near if not self.enemy.out(t) and self._fresh(t))
+        return repeat
 
 
 class User(Player):
     def ask(self) -> Point:
         while True:
+            flush(self.log)  # перед вводом пользователь должен увидеть все сообщения
             coords = input("Ваш ход: ").split()  # запрос координат у пользователя
             if len(coords) != 2:
-                print(" Введите 2 координаты! ")
+                self.log.append(" Введите 2 координаты! \n")
                 continue
 
             x, y = coords
 
             if not x.isdigit() or not y.isdigit():
-                print(" Введите числа! ")
+                self.log.append(" Введите числа! \n")
                 continue
 
-            x, y = int(x), int(y)
-
-            return Point(x - 1, y - 1)  # преобразуем ввод в координаты (0-based индекс)
+            return int(x) - 1, int(y) - 1  # преобразуем ввод в координаты (0-based индекс)
 
 
 class Game:
-    def __init__(self, size: int = 6):
+    def __init__(self, size: int = 6, auto: bool = False, seed: int | None = None):
         self.size = size
+        self.rng = random.Random(seed)  # один генератор на партию: при заданном seed игра воспроизводима
+        self._log: list[str] = []  # сообщения текущего хода, выводятся одной записью
         pl = self.random_board()  # создание доски пользователя
         co = self.random_board()  # создание доски компьютера
         co.hidden = True  # скрываем доску компьютера
 
-        self.ai = AI(co, pl)  # ИИ играет с доской компьютера и атакует доску пользователя
-        self.us = User(pl, co)  # пользователь играет с доской пользователя и атакует доску компьютера
+        self.ai = AI(co, pl, self._log, self.rng)  # ИИ играет с доской компьютера и атакует доску пользователя
+        # пользователь играет с доской пользователя и атакует доску компьютера; при auto за него ходит ИИ
+        self.us = AI(pl, co, self._log, self.rng, "пользователя") if auto else User(pl, co, self._log)
 
-    def try_board(self) -> Board:
+    def try_board(self) -> Board | None:
         lens = [3, 2, 2, 1, 1, 1, 1]  # размеры кораблей
-        board = Board(size=self.size)
-        attempts = 0
-        for l in lens:
-            while True:
-                attempts += 1
-                if attempts > 2000:
-                    return None  # возвращаем None, если слишком много неудачных попыток
-                ship = Ship(Point(random.randint(0, self.size - 1), random.randint(0, self.size - 1)), l,
-                            random.randint(0, 1))
-                try:
-                    board.add_ship(ship)  # пытаемся разместить корабль на доске
-                    break
-                except BoardWrongShipException:
-                    pass
+        placements = _generate_board(self.size, lens, self.rng)
+        if placements is None:
+            return None  # возвращаем None, если корабли не удалось расставить
+        board = Board(size=self.size, log=self._log)
+        for bow, l, d in placements:
+            board.add_ship(Ship(bow, l, d))
         board.begin()
         return board
 
@@ -218,51 +366,72 @@ class Game:
         return board
 
     def greet(self) -> None:
-        print("-------------------")
-        print("  Приветсвуем вас  ")
-        print("      в игре       ")
-        print("    морской бой    ")
-        print("-------------------")
-        print(" формат ввода: x y ")
-        print(" x - номер строки  ")
-        print(" y - номер столбца ")
+        self._log.append(
+            "-------------------\n"
+            "  Приветсвуем вас  \n"
+            "      в игре       \n"
+            "    морской бой    \n"
+            "-------------------\n"
+            " формат ввода: x y \n"
+            " x - номер строки  \n"
+            " y - номер столбца \n"
+        )
+        flush(self._log)
 
     def loop(self) -> None:
         num = 0  # номер текущего хода
+        sep = "-" * 20 + "\n"
         while True:
-            print("-" * 20)
-            print("Доска пользователя:")
-            print(self.us.board)
-            print("-" * 20)
-            print("Доска компьютера:")
-            print(self.ai.board)
+            self._log.append(f"{sep}Доска пользователя:\n{self.us.board}\n")
+            self._log.append(f"{sep}Доска компьютера:\n{self.ai.board}\n")
             if num % 2 == 0:
-                print("-" * 20)
-                print("Ходит пользователь!")
+                self._log.append(f"{sep}Ходит пользователь!\n")
                 repeat = self.us.move()  # ход пользователя
             else:
-                print("-" * 20)
-                print("Ходит компьютер!")
+                self._log.append(f"{sep}Ходит компьютер!\n")
                 repeat = self.ai.move()  # ход компьютера
             if repeat:
                 num -= 1  # если был удачный выстрел, ход повторяется
 
             if self.ai.board.defeat():
-                print("-" * 20)
-                print("Пользователь выиграл!")
+                self._log.append(f"{sep}Пользователь выиграл!\n")
+                flush(self._log)
                 break
 
             if self.us.board.defeat():
-                print("-" * 20)
-                print("Компьютер выиграл!")
+                self._log.append(f"{sep}Компьютер выиграл!\n")
+                flush(self._log)
                 break
             num += 1
+            flush(self._log)  # весь ход выводится одной записью
 
     def start(self) -> None:
         self.greet()
         self.loop()
 
 
+def bench(games: int, size: int = 6, seed: int | None = None) -> None:
+    # Партии компьютер против компьютера без вывода на экран - для замеров производительности
+    if games < 1:
+        raise ValueError("Количество партий должно быть положительным")
+    start = time.perf_counter()
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        for i in range(games):
+            Game(size, auto=True, seed=None if seed is None else seed + i).loop()
+    elapsed = time.perf_counter() - start
+    print(f"Сыграно партий: {games} за {elapsed:.3f} с ({elapsed / games * 1000:.3f} мс на партию)")
+
+
 if __name__ == "__main__":
-    game = Game()
-    game.start()
+    parser = argparse.ArgumentParser(description="Морской бой")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="сыграть N партий компьютер против компьютера без вывода и замерить время")
+    parser.add_argument("--seed", type=int, help="начальное значение генератора случайных чисел")
+    args = parser.parse_args()
+    if args.bench is not None:
+        if args.bench < 1:
+            parser.error("--bench: количество партий должно быть положительным")
+        bench(args.bench, seed=args.seed)
+    else:
+        game = Game(seed=args.seed)
+        game.start()
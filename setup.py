@@ -0,0 +1,12 @@
+# Сборка game.py в C-расширение через mypyc:
+#   pip install mypy
+#   python setup.py build_ext --inplace
+# После сборки "import game" подхватывает скомпилированный модуль.
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="seabattle",
+    py_modules=["game"],
+    ext_modules=mypycify(["game.py"]),
+)